@@ -1,19 +1,40 @@
 import streamlit as st
-from content_based_filtering import content_recommendation, train_transformer, transform_data
-from scipy.sparse import load_npz
 import pandas as pd
 from numpy import load
-from hybrid_recommendations import HybridRecommenderSystem
 from pathlib import Path
+import functools
 import json
-import requests
 import os
-from data_cleaning import data_for_content_filtering
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# heavy imports (scipy, sklearn via content_based_filtering, the recommenders)
+# are deferred to the code paths that need them to keep Streamlit cold-start fast
 
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 
+# The loaders run on worker threads, where st.stop() has no effect (the
+# ScriptRunner only honors stop requests on the script thread). Fatal
+# conditions are therefore raised as typed exceptions and handled — error UI
+# plus st.stop() — on the main thread after future.result() re-raises them.
+
+class _DataFileMissing(Exception):
+    """An artifact is absent and could not be downloaded."""
+    def __init__(self, path: Path):
+        super().__init__(str(path))
+        self.path = path
+
+class _LFSPointerFound(Exception):
+    """An artifact is an undownloaded Git LFS pointer."""
+    def __init__(self, path: Path):
+        super().__init__(str(path))
+        self.path = path
+
 def _st_list_data_dir_and_stop(missing_path: Path):
     st.error(f"Data file not found: {missing_path}")
     st.write("Looking for data files in:", str(DATA_DIR))
@@ -25,6 +46,17 @@ def _st_list_data_dir_and_stop(missing_path: Path):
         st.write("No `data/` directory found at", str(DATA_DIR))
     st.stop()
 
+def _st_lfs_pointer_help_and_stop(pointer_path: Path):
+    st.error("A Git LFS pointer file was found for: " + str(pointer_path.name))
+    st.write("This indicates the LFS object was not downloaded during deploy."
+             " Ensure your deployment source pulls Git LFS objects (Streamlit Cloud supports Git LFS),"
+             " or provide a direct download URL in `data/data_urls.json`.")
+    st.write("Helpful steps:")
+    st.write("- Confirm the Streamlit app is connected to the correct GitHub repo and branch.")
+    st.write("- Re-deploy the app and choose 'Clear cache and redeploy' in Streamlit Cloud.")
+    st.write("- Alternatively, host the data externally and add URLs to `data/data_urls.json`.")
+    st.stop()
+
 def _try_download_if_missing(path: Path) -> bool:
     """If a data_urls.json mapping exists, try to download the missing file.
     Returns True if file was downloaded successfully, False otherwise.
@@ -56,55 +88,94 @@ def _try_download_if_missing(path: Path) -> bool:
         return False
 
     try:
+        import requests
+
         st.info(f"Attempting to download `{key}` from provided URL...")
         # Ensure data dir exists
         os.makedirs(path.parent, exist_ok=True)
         with requests.get(url, stream=True, timeout=30) as r:
             r.raise_for_status()
+            size = int(r.headers.get("Content-Length") or 0)
             with open(path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                # preallocate from Content-Length so the filesystem doesn't
+                # grow the file extent-by-extent while streaming
+                if size:
+                    f.truncate(size)
+                # stream straight from the raw socket in 1 MiB blocks; avoids
+                # the per-chunk Python overhead of iter_content(8192)
+                r.raw.decode_content = True
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+                # trim in case the decoded body is shorter than the header said
+                f.truncate()
         st.success(f"Downloaded {key} to {path}")
         return True
     except Exception as e:
         st.warning(f"Failed to download {key}: {e}")
         return False
 
-def _read_csv_rel(path: Path):
-    # If file exists, ensure it's not a Git LFS pointer (pointer files are small text files)
-    if path.exists():
+@functools.lru_cache(maxsize=None)
+def _is_lfs_pointer(path_str: str, mtime: float) -> bool:
+    """Sniff whether a file is an undownloaded Git LFS pointer.
+
+    Cached on (path, mtime) so the check runs once per deployment rather than
+    on every call; a re-downloaded file changes its mtime and is re-checked.
+    """
+    try:
+        first_line = open(path_str, 'r', encoding='utf-8', errors='ignore').readline()
+        return first_line.strip().startswith('version https://git-lfs.github.com/spec/v1')
+    except Exception:
+        # if reading fails, let the caller's loader raise a useful error
+        return False
+
+def _read_csv_fast(path: Path, columns=None):
+    # pyarrow's multi-threaded C++ CSV parser beats pandas' single-threaded one
+    # by a wide margin on these files; pandas stays as the fallback
+    try:
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        return pd.read_csv(path, usecols=list(columns) if columns else None)
+
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=8 * 1024 * 1024)
+    convert_options = pa_csv.ConvertOptions(include_columns=list(columns)) if columns else None
+    table = pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options)
+    # plain to_pandas keeps numpy-backed dtypes: the recommenders and the
+    # demo-compute path (CountEncoder/sklearn) expect them, and pandas 2.x
+    # ArrowDtype arrays lack .item() used in the hybrid track-id lookup
+    return table.to_pandas()
+
+def _read_csv_rel(path: Path, columns=None):
+    # Prefer a parquet sibling if one was produced by the pipeline: columnar binary
+    # format skips CSV tokenization/type inference and lets us read only the columns
+    # the app actually uses.
+    parquet_path = path.with_suffix(".parquet")
+    if parquet_path.exists():
         try:
-            first_line = path.open('r', encoding='utf-8', errors='ignore').readline()
-            if first_line.strip().startswith('version https://git-lfs.github.com/spec/v1'):
-                st.error("A Git LFS pointer file was found for: " + str(path.name))
-                st.write("This indicates the LFS object was not downloaded during deploy."
-                         " Ensure your deployment source pulls Git LFS objects (Streamlit Cloud supports Git LFS),"
-                         " or provide a direct download URL in `data/data_urls.json`.")
-                st.write("Helpful steps:")
-                st.write("- Confirm the Streamlit app is connected to the correct GitHub repo and branch.")
-                st.write("- Re-deploy the app and choose 'Clear cache and redeploy' in Streamlit Cloud.")
-                st.write("- Alternatively, host the data externally and add URLs to `data/data_urls.json`.")
-                st.stop()
+            return pd.read_parquet(parquet_path, columns=columns, engine="pyarrow")
         except Exception:
-            # if reading fails, fall through and let pandas raise a useful error
+            # fall back to the CSV below if parquet read fails for any reason
             pass
 
+    # If file exists, ensure it's not a Git LFS pointer (pointer files are small text files)
+    if path.exists() and _is_lfs_pointer(str(path), path.stat().st_mtime):
+        raise _LFSPointerFound(path)
+
     try:
-        return pd.read_csv(path)
+        return _read_csv_fast(path, columns)
     except FileNotFoundError:
         # try to download if URL mapping provided, then retry
         if _try_download_if_missing(path):
-            return pd.read_csv(path)
-        _st_list_data_dir_and_stop(path)
+            return _read_csv_fast(path, columns)
+        raise _DataFileMissing(path)
 
 def _load_npz_rel(path: Path):
+    from scipy.sparse import load_npz
+
     try:
         return load_npz(path)
     except FileNotFoundError:
         if _try_download_if_missing(path):
             return load_npz(path)
-        _st_list_data_dir_and_stop(path)
+        raise _DataFileMissing(path)
 
 def _np_load_rel(path: Path, **kwargs):
     try:
@@ -112,122 +183,261 @@ def _np_load_rel(path: Path, **kwargs):
     except FileNotFoundError:
         if _try_download_if_missing(path):
             return load(path, **kwargs)
-        _st_list_data_dir_and_stop(path)
+        raise _DataFileMissing(path)
+
+# Cached loaders: Streamlit reruns this script top-to-bottom on every widget
+# interaction, so without caching each rerun re-reads the CSV/NPZ/NPY artifacts
+# from disk. cache_resource keeps one shared copy per process (no hashing or
+# pickling of the large matrices, unlike cache_data).
+
+@st.cache_resource(show_spinner=False)
+def load_songs(path_str: str, columns=None):
+    return _read_csv_rel(Path(path_str), columns=list(columns) if columns else None)
+
+@st.cache_resource(show_spinner=False)
+def load_sparse_matrix(path_str: str):
+    from scipy.sparse import isspmatrix_csr
+
+    # the recommenders row-slice these matrices (input vector lookup, matvec),
+    # so coerce to CSR once here rather than paying a format conversion per query
+    matrix = _load_npz_rel(Path(path_str))
+    return matrix if isspmatrix_csr(matrix) else matrix.tocsr()
+
+@st.cache_resource(show_spinner=False)
+def load_track_ids(path_str: str):
+    path = Path(path_str)
+    if path.exists():
+        try:
+            # a typed (non-pickled) save can be memory-mapped: only the pages
+            # actually indexed are paged in, keeping RSS low on small instances
+            return load(path, mmap_mode="r", allow_pickle=False)
+        except ValueError:
+            # legacy object-dtype save — cannot be mmapped, load it fully
+            pass
+    track_ids = _np_load_rel(path, allow_pickle=True)
+    if getattr(track_ids, "dtype", None) == object:
+        from numpy import asarray, save, str_
+
+        # migrate the pickled object array to a fixed-width unicode dtype so
+        # the next process start takes the mmap fast path above; write to a
+        # temp file and rename so a mid-write kill can't truncate the only
+        # copy of the artifact (the .npy suffix keeps np.save from appending)
+        track_ids = asarray(track_ids, dtype=str_)
+        tmp_path = path.with_suffix(".tmp.npy")
+        try:
+            save(tmp_path, track_ids)
+            os.replace(tmp_path, path)
+        except Exception:
+            # read-only filesystem — serve the typed copy for this process only
+            tmp_path.unlink(missing_ok=True)
+    return track_ids
+
+@st.cache_resource(show_spinner=False)
+def build_song_artist_index(path_str: str, _data):
+    # O(1) membership probe instead of scanning two full object columns per rerun;
+    # keyed by path so the underscored DataFrame arg is not hashed
+    return set(zip(_data["name"].to_numpy(), _data["artist"].to_numpy()))
+
+@st.cache_resource(show_spinner=False)
+def build_track_id_index(path_str: str, _track_ids):
+    # hash map for track_id -> interaction-matrix row, built once; saves the
+    # recommender an O(N) np.where scan per recommendation
+    return {track_id: i for i, track_id in enumerate(_track_ids)}
+
+@st.cache_resource(show_spinner=False)
+def compute_transformed_data(path_str: str, mtime: float):
+    # demo-mode fallback when transformed_data.npz is missing: keyed on the
+    # source file's path and mtime so the cache never hashes a DataFrame, and
+    # the transform runs once per process instead of per rerun
+    from content_based_filtering import train_transformer, transform_data
+    from data_cleaning import data_for_content_filtering
+
+    df_cf = data_for_content_filtering(_read_csv_rel(Path(path_str)))
+    train_transformer(df_cf)
+    transformed = transform_data(df_cf)
+    # persist the result (as CSR for fast row slicing) so the next process
+    # start takes the load_npz fast path instead of recomputing — but only
+    # when built from the real dataset: a sample-derived matrix at the
+    # canonical path would misalign against the full songs_data on later
+    # runs and dirty the DVC-tracked artifact
+    if Path(path_str) == DATA_DIR / "cleaned_data.csv":
+        try:
+            from scipy.sparse import save_npz, isspmatrix_csr
+
+            if not isspmatrix_csr(transformed):
+                transformed = transformed.tocsr()
+            save_npz(DATA_DIR / "transformed_data.npz", transformed)
+        except Exception:
+            # read-only filesystem on some deploys — recompute next time
+            pass
+    return transformed
+
+def render_recommendations(recommendations):
+    """Render the recommendation list (shared by content and hybrid modes)."""
+    # itertuples hands back plain tuples from C; iterrows boxes every cell
+    # into a per-row Series
+    rows = recommendations[["name", "artist", "spotify_preview_url"]].itertuples(index=True, name=None)
+    for ind, name, artist, url in rows:
+        song_name = str(name).title()
+        artist_name = str(artist).title()
+
+        if ind == 0:
+            st.markdown("## Currently Playing")
+            st.markdown(f"#### **{song_name}** by **{artist_name}**")
+        elif ind == 1:
+            st.markdown("### Next Up 🎵")
+            st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
+        else:
+            st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
+
+        url = str(url or '').strip()
+        if url and url.lower() != 'nan':
+            st.audio(url)
+        st.write('---')
 
 # load the data (paths resolved relative to this file)
 cleaned_data_path = DATA_DIR / "cleaned_data.csv"
+transformed_data_path = DATA_DIR / "transformed_data.npz"
+# the UI only needs these columns; the full set is required only when content
+# features must be recomputed on the fly (transformed_data.npz missing)
+display_columns = ["name", "artist", "spotify_preview_url"]
+songs_columns = tuple(display_columns) if transformed_data_path.exists() else None
 # prefer the full data; if missing on deploy, fall back to a small sample included in the repo
 sample_cleaned = DATA_DIR / "cleaned_data_sample.csv"
-if cleaned_data_path.exists():
-    songs_data = _read_csv_rel(cleaned_data_path)
-elif sample_cleaned.exists():
+songs_source_path = str(cleaned_data_path)
+if not (cleaned_data_path.exists() or cleaned_data_path.with_suffix(".parquet").exists()) and sample_cleaned.exists():
     st.warning("Full dataset not found — using bundled small sample for deployment.")
-    songs_data = pd.read_csv(sample_cleaned)
-else:
-    songs_data = _read_csv_rel(cleaned_data_path)
+    songs_source_path = str(sample_cleaned)
+    songs_columns = None
 
-# load or compute the transformed data (content-based)
-transformed_data_path = DATA_DIR / "transformed_data.npz"
+filtered_data_path = DATA_DIR / "collab_filtered_data.csv"
+interaction_matrix_path = DATA_DIR / "interaction_matrix.npz"
+transformed_hybrid_data_path = DATA_DIR / "transformed_hybrid_data.npz"
+track_ids_path = DATA_DIR / "track_ids.npy"
+
+# Dispatch the artifact loads concurrently: the GIL is released during file
+# reads, so the first run pays roughly for the slowest artifact instead of the
+# sum of all of them; later reruns hit the caches and return immediately.
+jobs = {"songs_data": lambda: load_songs(songs_source_path, columns=songs_columns)}
 if transformed_data_path.exists():
-    transformed_data = load_npz(transformed_data_path)
+    jobs["transformed_data"] = lambda: load_sparse_matrix(str(transformed_data_path))
+if filtered_data_path.exists() or filtered_data_path.with_suffix(".parquet").exists():
+    # track_id is needed to resolve the row in the interaction matrix
+    jobs["filtered_data"] = lambda: load_songs(str(filtered_data_path), columns=tuple(["track_id"] + display_columns))
+if interaction_matrix_path.exists():
+    jobs["interaction_matrix"] = lambda: load_sparse_matrix(str(interaction_matrix_path))
+if transformed_hybrid_data_path.exists():
+    jobs["transformed_hybrid_data"] = lambda: load_sparse_matrix(str(transformed_hybrid_data_path))
+if track_ids_path.exists():
+    jobs["track_ids"] = lambda: load_track_ids(str(track_ids_path))
+
+# the download fallback renders informational st.info/st.warning messages;
+# worker threads don't inherit the ScriptRunContext, so attach it or those
+# messages are dropped (fatal conditions don't rely on the context: the
+# loaders raise typed exceptions handled below on the main thread, because
+# st.stop only takes effect on the script thread)
+script_ctx = get_script_run_ctx()
+
+def _attach_script_ctx():
+    if script_ctx is not None:
+        add_script_run_ctx(threading.current_thread(), script_ctx)
+
+with ThreadPoolExecutor(max_workers=len(jobs), initializer=_attach_script_ctx) as executor:
+    futures = {name: executor.submit(job) for name, job in jobs.items()}
+    try:
+        loaded = {name: future.result() for name, future in futures.items()}
+    except _LFSPointerFound as e:
+        _st_lfs_pointer_help_and_stop(e.path)
+    except _DataFileMissing as e:
+        _st_list_data_dir_and_stop(e.path)
+
+songs_data = loaded["songs_data"]
+songs_index = build_song_artist_index(songs_source_path, songs_data)
+
+# load or compute the transformed data (content-based)
+if "transformed_data" in loaded:
+    transformed_data = loaded["transformed_data"]
 else:
-    # Compute on the fly from available songs_data (works with sample too)
+    # Compute on the fly from the songs source (works with sample too)
     try:
         st.warning("transformed_data.npz not found — computing content features on the fly (demo mode).")
-        df_cf = data_for_content_filtering(songs_data.copy())
-        # train transformer and transform data
-        train_transformer(df_cf)
-        transformed_data = transform_data(df_cf)
+        songs_source = Path(songs_source_path)
+        if not songs_source.exists():
+            songs_source = songs_source.with_suffix(".parquet")
+        songs_source_mtime = songs_source.stat().st_mtime if songs_source.exists() else 0.0
+        transformed_data = compute_transformed_data(songs_source_path, songs_source_mtime)
     except Exception as e:
         st.error(f"Unable to compute content features: {e}")
         _st_list_data_dir_and_stop(transformed_data_path)
 
-# track ids are only required for hybrid mode; load conditionally below
-track_ids = None
+# hybrid/collaborative artifacts: all four must be present, otherwise hybrid
+# mode is disabled gracefully
+filtered_data = loaded.get("filtered_data")
+interaction_matrix = loaded.get("interaction_matrix")
+transformed_hybrid_data = loaded.get("transformed_hybrid_data")
+track_ids = loaded.get("track_ids")
+hybrid_available = all(
+    artifact is not None
+    for artifact in (filtered_data, interaction_matrix, transformed_hybrid_data, track_ids)
+)
+track_id_to_row = build_track_id_index(str(track_ids_path), track_ids) if hybrid_available else None
 
-# Try to load hybrid/collaborative artifacts; if missing, disable hybrid mode gracefully
-hybrid_available = True
+# Title
+st.title('Welcome to the Spotify Song Recommender!')
 
-filtered_data = None
-filtered_data_path = DATA_DIR / "collab_filtered_data.csv"
-if filtered_data_path.exists():
-    filtered_data = _read_csv_rel(filtered_data_path)
-else:
-    hybrid_available = False
+# Subheader
+st.write('### Enter the name of a song and the recommender will suggest similar songs 🎵🎧')
 
-interaction_matrix = None
-interaction_matrix_path = DATA_DIR / "interaction_matrix.npz"
-if interaction_matrix_path.exists():
-    interaction_matrix = load_npz(interaction_matrix_path)
-else:
-    hybrid_available = False
+if not hybrid_available:
+    st.info("Hybrid mode artifacts not found on deploy — running in content-based demo mode.")
 
-transformed_hybrid_data = None
-transformed_hybrid_data_path = DATA_DIR / "transformed_hybrid_data.npz"
-if transformed_hybrid_data_path.exists():
-    transformed_hybrid_data = load_npz(transformed_hybrid_data_path)
-else:
-    hybrid_available = False
+# The query widgets live in a form so the lookups and rendering below run once
+# per submit instead of on every keystroke
+with st.form("query"):
+    # Text Input
+    song_name = st.text_input('Enter a song name:')
+    # artist name
+    artist_name = st.text_input('Enter the artist name:')
 
-# load track ids only if present; otherwise disable hybrid
-track_ids_path = DATA_DIR / "track_ids.npy"
-if track_ids_path.exists():
-    track_ids = _np_load_rel(track_ids_path, allow_pickle=True)
-else:
-    hybrid_available = False
+    # k recommndations
+    k = st.selectbox('How many recommendations do you want?', [5,10,15,20], index=1)
 
-# Title
-st.title('Welcome to the Spotify Song Recommender!')
+    diversity = 5
+    if hybrid_available:
+        # diversity slider
+        diversity = st.slider(label="Diversity in Recommendations",
+                            min_value=1,
+                            max_value=9,
+                            value=5,
+                            step=1)
 
-# Subheader
-st.write('### Enter the name of a song and the recommender will suggest similar songs 🎵🎧')
+    submitted = st.form_submit_button('Get Recommendations')
 
-# Text Input
-song_name = st.text_input('Enter a song name:')
-st.write('You entered:', song_name)
-# artist name
-artist_name = st.text_input('Enter the artist name:')
-st.write('You entered:', artist_name)
 # lowercase the input
 song_name = song_name.lower()
 artist_name = artist_name.lower()
 
-# k recommndations
-k = st.selectbox('How many recommendations do you want?', [5,10,15,20], index=1)
+content_based_weight = 1 - (diversity / 10)
 
 # Determine available mode and default filtering type
 filtering_type = 'Content-Based Filtering'
-if hybrid_available and filtered_data is not None:
+if submitted and hybrid_available and filtered_data is not None:
     try:
-        if ((filtered_data["name"] == song_name) & (filtered_data["artist"] == artist_name)).any():
+        filtered_index = build_song_artist_index(str(filtered_data_path), filtered_data)
+        if (song_name, artist_name) in filtered_index:
             filtering_type = "Hybrid Recommender System"
     except Exception:
         filtering_type = 'Content-Based Filtering'
 
-    # diversity slider
-    diversity = st.slider(label="Diversity in Recommendations",
-                        min_value=1,
-                        max_value=9,
-                        value=5,
-                        step=1)
-
-    content_based_weight = 1 - (diversity / 10)
-    
-    # plot a bar graph
-    chart_data = pd.DataFrame({
-        "type" : ["Personalized", "Diverse"],
-        "ratio": [10 - diversity, diversity]
-    })
-    
-    st.bar_chart(chart_data,x="type",y="ratio")
-    
-if not hybrid_available:
-    st.info("Hybrid mode artifacts not found on deploy — running in content-based demo mode.")
+if submitted and hybrid_available:
+    # plot a bar graph — a 2-element Series is enough, no DataFrame needed
+    st.bar_chart(pd.Series({"Personalized": 10 - diversity, "Diverse": diversity}))
+
+if submitted:
+    if filtering_type == 'Content-Based Filtering':
+        if (song_name, artist_name) in songs_index:
+            from content_based_filtering import content_recommendation
 
-# Button
-if filtering_type == 'Content-Based Filtering':
-    if st.button('Get Recommendations'):
-        if ((songs_data["name"] == song_name) & (songs_data['artist'] == artist_name)).any():
             st.write('Recommendations for', f"**{song_name}** by **{artist_name}**")
             recommendations = content_recommendation(song_name=song_name,
                                                      artist_name=artist_name,
@@ -236,72 +446,33 @@ if filtering_type == 'Content-Based Filtering':
                                                      k=k)
             
             # Display Recommendations
-            for ind , recommendation in recommendations.iterrows():
-                song_name = recommendation['name'].title()
-                artist_name = recommendation['artist'].title()
-                
-                if ind == 0:
-                    st.markdown("## Currently Playing")
-                    st.markdown(f"#### **{song_name}** by **{artist_name}**")
-                    _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                    if _url and _url.lower() != 'nan':
-                        st.audio(_url)
-                    st.write('---')
-                elif ind == 1:   
-                    st.markdown("### Next Up 🎵")
-                    st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
-                    _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                    if _url and _url.lower() != 'nan':
-                        st.audio(_url)
-                    st.write('---')
-                else:
-                    st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
-                    _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                    if _url and _url.lower() != 'nan':
-                        st.audio(_url)
-                    st.write('---')
+            render_recommendations(recommendations)
         else:
             st.write(f"Sorry, we couldn't find {song_name} in our database. Please try another song.")
-            
-elif filtering_type == "Hybrid Recommender System" and hybrid_available:
-    if st.button('Get Recommendations'):
+
+    elif filtering_type == "Hybrid Recommender System":
+        from hybrid_recommendations import HybridRecommenderSystem
+
         st.write('Recommendations for', f"**{song_name}** by **{artist_name}**")
-        recommender = HybridRecommenderSystem(
-                                                number_of_recommendations= k,
-                                                weight_content_based= content_based_weight
-                                                )
-                                
+        # reuse the recommender across clicks with the same settings instead of
+        # constructing a fresh instance every time (session_state keys are strings)
+        recommender_key = f"hybrid_recommender_{k}_{content_based_weight}"
+        recommender = st.session_state.get(recommender_key)
+        if recommender is None:
+            recommender = HybridRecommenderSystem(
+                                                    number_of_recommendations= k,
+                                                    weight_content_based= content_based_weight
+                                                    )
+            st.session_state[recommender_key] = recommender
+
+
         # get the recommendations
         recommendations = recommender.give_recommendations(song_name= song_name,
                                 artist_name= artist_name,
                                 songs_data= filtered_data,
                                 transformed_matrix= transformed_hybrid_data,
                                 track_ids= track_ids,
-                                interaction_matrix= interaction_matrix)
+                                interaction_matrix= interaction_matrix,
+                                track_id_to_index= track_id_to_row)
         # Display Recommendations
-        for ind , recommendation in recommendations.iterrows():
-            song_name = recommendation['name'].title()
-            artist_name = recommendation['artist'].title()
-            
-            if ind == 0:
-                st.markdown("## Currently Playing")
-                st.markdown(f"#### **{song_name}** by **{artist_name}**")
-                _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                if _url and _url.lower() != 'nan':
-                    st.audio(_url)
-                st.write('---')
-            elif ind == 1:   
-                st.markdown("### Next Up 🎵")
-                st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
-                _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                if _url and _url.lower() != 'nan':
-                    st.audio(_url)
-                st.write('---')
-            else:
-                st.markdown(f"#### {ind}. **{song_name}** by **{artist_name}**")
-                _url = str(recommendation.get('spotify_preview_url') or '').strip()
-                if _url and _url.lower() != 'nan':
-                    st.audio(_url)
-                st.write('---')
-elif filtering_type == "Hybrid Recommender System" and not hybrid_available:
-    st.warning("Hybrid recommendations are unavailable in this deployment. Please provide hybrid artifacts or use content-based mode.")
\ No newline at end of file
+        render_recommendations(recommendations)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pandas as pd
 import dask.dataframe as dd
+from pathlib import Path
 from scipy.sparse import csr_matrix, save_npz
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
@@ -26,7 +27,9 @@ def filter_songs_data(songs_data: pd.DataFrame, track_ids: list, save_df_path: s
     filtered_data.reset_index(drop=True, inplace=True)
     # save the data
     save_pandas_data_to_csv(filtered_data, save_df_path)
-    
+    # save a parquet copy for faster loading in the app
+    save_pandas_data_to_parquet(filtered_data, str(Path(save_df_path).with_suffix(".parquet")))
+
     return filtered_data
 
 
@@ -35,6 +38,17 @@ def save_pandas_data_to_csv(data: pd.DataFrame, file_path: str) -> None:
     Save the data to a csv file
     """
     data.to_csv(file_path, index=False)
+
+
+def save_pandas_data_to_parquet(data: pd.DataFrame, file_path: str) -> None:
+    """
+    Save the data to a parquet file
+    """
+    # store the lookup columns as Arrow-backed strings so equality checks in
+    # the app run vectorized in native code
+    lookup_cols = [col for col in ("name", "artist") if col in data.columns]
+    data = data.assign(**{col: data[col].astype("string[pyarrow]") for col in lookup_cols})
+    data.to_parquet(file_path, index=False, compression="zstd")
     
     
 def save_sparse_matrix(matrix: csr_matrix, file_path: str) -> None:
@@ -61,8 +75,10 @@ def create_interaction_matrix(history_data:dd.DataFrame, track_ids_save_path, sa
     # get the list of track_ids
     track_ids = df['track_id'].cat.categories.values
     
-    # save the categories
-    np.save(track_ids_save_path, track_ids, allow_pickle=True)
+    # save the categories as a fixed-width unicode array: loads as one
+    # read + memcpy instead of per-element unpickling, and the app can
+    # memory-map it
+    np.save(track_ids_save_path, np.asarray(track_ids, dtype=np.str_))
     
     # add the index columns to the dataframe
     df = df.assign(
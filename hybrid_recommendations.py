@@ -28,13 +28,17 @@ class HybridRecommenderSystem:
         return content_similarity_scores
         
     
-    def __calculate_collaborative_filtering_similarities(self, song_name, artist_name, track_ids, songs_data, interaction_matrix):
+    def __calculate_collaborative_filtering_similarities(self, song_name, artist_name, track_ids, songs_data, interaction_matrix, track_id_to_index=None):
         # fetch the row from songs data
         song_row = songs_data.loc[(songs_data["name"] == song_name) & (songs_data["artist"] == artist_name)]
         # track_id of input song
         input_track_id = song_row['track_id'].values.item()
-        # index value of track_id
-        ind = np.where(track_ids == input_track_id)[0].item()
+        # index value of track_id: O(1) via the precomputed mapping when the
+        # caller provides one, otherwise fall back to an O(N) scan
+        if track_id_to_index is not None:
+            ind = track_id_to_index[input_track_id]
+        else:
+            ind = np.where(track_ids == input_track_id)[0].item()
         # fetch the input vector
         input_array = interaction_matrix[ind]
         # get similarity scores
@@ -54,7 +58,7 @@ class HybridRecommenderSystem:
         return weighted_scores
     
     
-    def give_recommendations(self, song_name, artist_name, songs_data, track_ids, transformed_matrix, interaction_matrix):
+    def give_recommendations(self, song_name, artist_name, songs_data, track_ids, transformed_matrix, interaction_matrix, track_id_to_index=None):
         # calculate content based similarities
         content_based_similarities = self.__calculate_content_based_similarities(song_name= song_name, 
                                                                                artist_name= artist_name, 
@@ -65,8 +69,9 @@ class HybridRecommenderSystem:
         collaborative_filtering_similarities = self.__calculate_collaborative_filtering_similarities(song_name= song_name, 
                                                                                                    artist_name= artist_name, 
                                                                                                    track_ids= track_ids, 
-                                                                                                   songs_data= songs_data, 
-                                                                                                   interaction_matrix= interaction_matrix)
+                                                                                                   songs_data= songs_data,
+                                                                                                   interaction_matrix= interaction_matrix,
+                                                                                                   track_id_to_index= track_id_to_index)
     
         # normalize content based similarities
         normalized_content_based_similarities = self.__normalize_similarities(content_based_similarities)